@@ -0,0 +1,76 @@
+"""
+_sentence_utils.py
+
+Text helpers shared by style_assistant_uk_academic.py and
+uk_academic_humaniser.py. Patterns are compiled once at import.
+"""
+
+import re
+
+# Runs of whitespace (collapsed to a single space before output)
+SPACE_PATTERN = re.compile(r"\s+")
+
+# A sentence is a run of text up to and including its terminal punctuation,
+# or whatever trails after the last terminator. A bare run of terminators
+# (e.g. a leading "...") is kept as a sentence of its own.
+SENTENCE_PATTERN = re.compile(r"\s*([^.!?]*[.!?]+|\S[^.!?]*$)")
+
+# Last character of a finished terminator run (one followed by something
+# else). Every such run ends a SENTENCE_PATTERN match, so text can be split
+# just after it and the parts processed separately.
+SENTENCE_END_PATTERN = re.compile(r"[.!?](?=[^.!?])")
+
+
+def split_sentences(text: str):
+    """Crude sentence splitter: good enough for these tools."""
+    sentences = []
+    for m in SENTENCE_PATTERN.finditer(text):
+        s = m.group(1).strip()
+        if s:
+            sentences.append(s)
+    return sentences
+
+
+def stream_sentences(f, chunk_size: int = 8192):
+    """
+    Yield the sentences of file-like object f as they are read, in chunks of
+    chunk_size characters. Gives the same sentences as
+    split_sentences(f.read()) without holding the whole text in memory.
+    """
+    pending = []  # chunks read since the last sentence end
+    last = ""  # final character of the previous chunk
+    for chunk in iter(lambda: f.read(chunk_size), ""):
+        # Only the new chunk is searched, plus the character before it in
+        # case a terminator run ended exactly at the chunk boundary
+        cut = None
+        for cut in SENTENCE_END_PATTERN.finditer(last + chunk):
+            pass
+        if cut is None:
+            pending.append(chunk)
+        else:
+            cut = cut.end() - len(last)
+            pending.append(chunk[:cut])
+            yield from split_sentences("".join(pending))
+            pending = [chunk[cut:]]
+        last = chunk[-1]
+    yield from split_sentences("".join(pending))
+
+
+def greedy_fill(text: str, width: int = 90) -> str:
+    """
+    Wrap text into lines of at most width characters, breaking only between
+    words (a longer word gets a line of its own). A lighter stand-in for
+    textwrap.fill on text whose whitespace is already collapsed.
+    """
+    lines = []
+    line = []
+    length = 0
+    for word in text.split():
+        if line and length + 1 + len(word) > width:
+            lines.append(" ".join(line))
+            line = []
+        length = length + 1 + len(word) if line else len(word)
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return "\n".join(lines)
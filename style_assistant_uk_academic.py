@@ -19,12 +19,23 @@ Features:
 Usage examples:
     python style_assistant_uk_academic.py < input.txt
     python style_assistant_uk_academic.py --clean < input.txt
+
+Optional: install pyahocorasick and/or numba to speed up analysis of long texts.
 """
 
+import os
 import re
 import sys
-import collections
-from textwrap import fill
+import functools
+import string
+from typing import NamedTuple
+
+from _sentence_utils import SPACE_PATTERN, greedy_fill, split_sentences, stream_sentences
+
+try:
+    import ahocorasick  # optional: pyahocorasick
+except ImportError:
+    ahocorasick = None
 
 # -----------------------------
 # Config / dictionaries
@@ -49,7 +60,6 @@ CONTRACTION_MAP = {
     "shouldn't": "should not",
     "couldn't": "could not",
     "I'm": "I am",
-    "I'm": "I am",
     "you're": "you are",
     "we're": "we are",
     "they're": "they are",
@@ -85,178 +95,421 @@ INFORMAL_MAP = {
     "wanna": "want to",
 }
 
-INFORMAL_PATTERN = re.compile(
-    r"\b(" + "|".join(re.escape(k) for k in INFORMAL_MAP.keys()) + r")\b",
-    flags=re.IGNORECASE,
-)
 
-CONTRACTION_PATTERN = re.compile(
-    r"\b(" + "|".join(re.escape(k) for k in CONTRACTION_MAP.keys()) + r")\b"
+def _longest_first(keys) -> tuple:
+    """Keys sorted longest first (then alphabetically), for alternations."""
+    return tuple(sorted(keys, key=lambda k: (-len(k), k)))
+
+
+@functools.cache
+def _build_alternation(keys: frozenset):
+    """
+    Compile r"\b(?:(k1)|(k2)|...)\b" for a set of literal keys and return
+    (pattern, ordered_keys). There is one capturing group per key, so
+    m.lastindex - 1 indexes ordered_keys (and lists built in that order)
+    without hashing or lower-casing the match. Longer keys come first so a
+    key never shadows a longer one it prefixes. Cached per key set, so
+    rebuilding for an unchanged map costs nothing.
+    """
+    ordered = _longest_first(keys)
+    pattern = re.compile(r"\b(?:" + "|".join(f"({re.escape(k)})" for k in ordered) + r")\b")
+    return pattern, ordered
+
+
+@functools.cache
+def _build_fused_alternation(groups: tuple):
+    """
+    Compile r"\b(?:(?P<name1>k1|k2|...)|(?P<name2>...)|...)\b" from a tuple
+    of (name, frozenset of keys) pairs, so m.lastgroup names the key set
+    that matched. Groups are tried in the order given; keys within each are
+    ordered as in _build_alternation. Cached like _build_alternation.
+    """
+    body = "|".join(
+        f"(?P<{name}>" + "|".join(re.escape(k) for k in _longest_first(keys)) + ")"
+        for name, keys in groups
+    )
+    return re.compile(r"\b(?:" + body + r")\b")
+
+
+# INFORMAL_MAP keys are lower-case: INFORMAL_PATTERN is run over lower-cased
+# text (see _lower) rather than with re.IGNORECASE.
+INFORMAL_PATTERN, _informal_keys = _build_alternation(frozenset(INFORMAL_MAP))
+INFORMAL_SUGGESTIONS = [INFORMAL_MAP[k] for k in _informal_keys]
+
+CONTRACTION_PATTERN, _contraction_keys = _build_alternation(frozenset(CONTRACTION_MAP))
+CONTRACTION_EXPANSIONS = [CONTRACTION_MAP[k] for k in _contraction_keys]
+
+# First-person pronouns to flag (case-sensitive)
+FIRST_PERSON_WORDS = ("I", "we", "We", "our", "Our", "us")
+
+FIRST_PERSON_PATTERN, _ = _build_alternation(frozenset(FIRST_PERSON_WORDS))
+
+# All three per-sentence checks fused into one scan over the lower-cased
+# sentence; dispatch on ``lastgroup``. Contractions and pronouns are
+# case-sensitive, so those matches are checked against the original text.
+ALL_PATTERNS = _build_fused_alternation(
+    (
+        ("contr", frozenset(k.lower() for k in CONTRACTION_MAP)),
+        ("inf", frozenset(INFORMAL_MAP)),
+        ("fp", frozenset(k.lower() for k in FIRST_PERSON_WORDS)),
+    )
 )
 
-FIRST_PERSON_PATTERN = re.compile(r"\b(I|we|We|our|Our|us)\b")
+# Maps A-Z to a-z; see _lower
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# A word, optionally with one apostrophe inside (don't, it's)
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)?")
+
+# Sentence breaks used to split text into independently cleaned segments
+CLEAN_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def _build_automaton():
+    """
+    Aho-Corasick automaton over the lower-cased contraction, informal and
+    first-person words, or None when pyahocorasick is not installed.
+    Each word maps to (kind, spelling); pronouns that differ only in case
+    share one entry and are checked against FIRST_PERSON_WORDS instead.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for k in CONTRACTION_MAP:
+        automaton.add_word(k.lower(), ("contr", k))
+    for k in INFORMAL_MAP:
+        automaton.add_word(k.lower(), ("inf", k))
+    for k in FIRST_PERSON_WORDS:
+        automaton.add_word(k.lower(), ("fp", k))
+    automaton.make_automaton()
+    return automaton
+
+
+AUTOMATON = _build_automaton()
+
+
+def _scan_ascii_words(buf):
+    """
+    Walk ASCII-encoded bytes once and return (count, start1, end1, start2,
+    end2): the number of WORD_PATTERN matches and the spans of the first two
+    of them (empty if missing). Only called once compiled by _enable_jit.
+    """
+    n = len(buf)
+    count = 0
+    start = start1 = end1 = start2 = end2 = 0
+    # 0: between words, 1: in a word, 2: just past its apostrophe, 3: after it
+    state = 0
+    for i in range(n + 1):
+        b = buf[i] if i < n else 32
+        if 48 <= b <= 57 or 65 <= b <= 90 or 97 <= b <= 122 or b == 95:  # \w
+            if state == 0:
+                count += 1
+                start = i
+                state = 1
+            elif state == 2:
+                state = 3
+        elif state == 1 and b == 39:  # at most one apostrophe per word
+            state = 2
+        elif state != 0:
+            # An apostrophe with no word character after it is not included
+            end = i - 1 if state == 2 else i
+            state = 0
+            if count == 1:
+                start1, end1 = start, end
+            elif count == 2:
+                start2, end2 = start, end
+    return count, start1, end1, start2, end2
+
+
+# numba is only imported, and the kernel compiled, for inputs known to be at
+# least JIT_MIN_CHARS long. Importing it and loading the cached kernel takes
+# about 0.4 s and the kernel saves about 50 ns per character, so it only pays
+# off past roughly 8 MB of text.
+JIT_MIN_CHARS = 10_000_000
+_jit_kernel = None
+_jit_tried = False
+
+
+def _enable_jit():
+    """Compile _scan_ascii_words with numba if it is installed (once)."""
+    global _jit_kernel, _jit_tried
+    if _jit_tried:
+        return
+    _jit_tried = True
+    try:
+        from numba import njit  # optional: JIT-compiled word counting
+    except ImportError:
+        return
+    _jit_kernel = njit(cache=True)(_scan_ascii_words)
 
 # -----------------------------
 # Helpers
 # -----------------------------
 
 
-def split_sentences(text: str):
-    """Crude sentence splitter: good enough for this assistant."""
-    text = re.sub(r"([.!?])([A-Za-z])", r"\1 \2", text)
-    parts = re.split(r"([.!?])", text)
-    sentences = []
-    for i in range(0, len(parts) - 1, 2):
-        s = (parts[i] + parts[i + 1]).strip()
-        if s:
-            sentences.append(s)
-    if len(parts) % 2 != 0 and parts[-1].strip():
-        sentences.append(parts[-1].strip())
-    return sentences
+class Issue(NamedTuple):
+    """
+    A single style issue found by analyse_text. The sentence itself is
+    sentences[sentence_index - 1] rather than a copy on every issue.
+    """
 
+    type: str
+    sentence_index: int
+    message: str
 
-def analyse_text(text: str):
+
+def _scan_words(lowered: str):
     """
-    Analyse text and return:
-      - sentences
-      - list of issues (each issue is a dict)
+    Return (word_count, first, second) for a lower-cased sentence, where
+    "don't" etc. count as one word and first/second are the opening words
+    ("" if missing). One pass over the words; no list of them is built.
     """
-    sentences = split_sentences(text)
-    issues = []
+    if _jit_kernel is not None and lowered.isascii():
+        count, start1, end1, start2, end2 = _jit_kernel(lowered.encode("ascii"))
+        return count, lowered[start1:end1], lowered[start2:end2]
+
+    words = WORD_PATTERN.finditer(lowered)
+    first = next(words, None)
+    second = next(words, None)
+    count = (first is not None) + (second is not None) + sum(1 for _ in words)
+    return (
+        count,
+        first.group(0) if first else "",
+        second.group(0) if second else "",
+    )
 
-    # Track repeated sentence starts (first 2 words)
-    starts = []
 
-    for idx, s in enumerate(sentences, start=1):
-        words = re.findall(r"\w+('\w+)?", s)
-        word_count = len(words)
+def _is_word_char(s: str, i: int) -> bool:
+    """True if s[i] exists and would match \\w."""
+    return 0 <= i < len(s) and (s[i].isalnum() or s[i] == "_")
 
-        # Sentence length flags
-        if word_count > 35:
-            issues.append(
-                {
-                    "type": "long_sentence",
-                    "sentence_index": idx,
-                    "message": f"Sentence {idx} is quite long ({word_count} words). "
-                               f"Consider splitting it for clarity.",
-                    "extract": s,
-                }
+
+def _lower(s: str) -> str:
+    """
+    Lower-case s without changing its length, so that match spans in the
+    result line up with s. Characters such as 'İ' lower-case to two
+    characters; if s has any, only A-Z are lower-cased.
+    """
+    lowered = s.lower()
+    return lowered if len(lowered) == len(s) else s.translate(ASCII_LOWER)
+
+
+def _scan_sentence(s: str, lowered: str):
+    """
+    Return (contractions, informal, first_person), in order of appearance,
+    given s and _lower(s). Contractions and first-person pronouns are the
+    matched words; informal entries are (word, INFORMAL_MAP key) pairs.
+    """
+    contractions, informal, first_person = [], [], []
+
+    if AUTOMATON is not None:
+        for end, (kind, key) in AUTOMATON.iter(lowered):
+            start = end - len(key) + 1
+            if _is_word_char(s, start - 1) or _is_word_char(s, end + 1):
+                continue
+            w = s[start:end + 1]
+            # Contractions and pronouns are matched case-sensitively
+            if kind == "inf":
+                informal.append((w, key))
+            elif kind == "contr":
+                if w == key:
+                    contractions.append(w)
+            elif w in FIRST_PERSON_WORDS:
+                first_person.append(w)
+        return contractions, informal, first_person
+
+    for m in ALL_PATTERNS.finditer(lowered):
+        kind = m.lastgroup
+        w = s[m.start():m.end()]
+        if kind == "contr":
+            if w in CONTRACTION_MAP:
+                contractions.append(w)
+            # "I'm", "we're" etc. also open with a first-person pronoun
+            lead = FIRST_PERSON_PATTERN.match(w)
+            if lead:
+                first_person.append(lead.group(0))
+        elif kind == "inf":
+            informal.append((w, m.group(0)))
+        elif w in FIRST_PERSON_WORDS:
+            first_person.append(w)
+    return contractions, informal, first_person
+
+
+@functools.lru_cache(maxsize=4096)
+def _analyse_sentence(s: str):
+    """
+    Check a single sentence and return (found, start):
+      - found: tuple of (type, message) pairs; each message has an "{idx}"
+        placeholder for the sentence number
+      - start: the sentence opening (first 2 words), lower-cased
+    Cached, as headings and boilerplate sentences tend to repeat.
+    """
+    found = []
+
+    lowered = _lower(s)
+    word_count, first, second = _scan_words(lowered)
+
+    # Sentence length flags
+    if word_count > 35:
+        found.append(
+            (
+                "long_sentence",
+                f"Sentence {{idx}} is quite long ({word_count} words). "
+                f"Consider splitting it for clarity.",
             )
-        elif word_count < 7:
-            issues.append(
-                {
-                    "type": "short_sentence",
-                    "sentence_index": idx,
-                    "message": f"Sentence {idx} is very short ({word_count} words). "
-                               f"In academic writing, you may wish to combine it with a neighbouring sentence.",
-                    "extract": s,
-                }
+        )
+    elif word_count < 7:
+        found.append(
+            (
+                "short_sentence",
+                f"Sentence {{idx}} is very short ({word_count} words). "
+                f"In academic writing, you may wish to combine it with a neighbouring sentence.",
             )
+        )
 
-        # Contractions
-        for m in CONTRACTION_PATTERN.finditer(s):
-            issues.append(
-                {
-                    "type": "contraction",
-                    "sentence_index": idx,
-                    "message": f"Contraction '{m.group(0)}' found in sentence {idx}. "
-                               f"Consider using the full form in academic writing.",
-                    "extract": s,
-                }
-            )
+    contractions, informal, first_person = _scan_sentence(s, lowered)
 
-        # Informal words
-        for m in INFORMAL_PATTERN.finditer(s):
-            w = m.group(0)
-            suggestion = INFORMAL_MAP.get(w.lower(), "Consider a more precise alternative.")
-            issues.append(
-                {
-                    "type": "informal",
-                    "sentence_index": idx,
-                    "message": f"Informal or vague word '{w}' in sentence {idx}. {suggestion}",
-                    "extract": s,
-                }
+    # Contractions
+    for w in contractions:
+        found.append(
+            (
+                "contraction",
+                f"Contraction '{w}' found in sentence {{idx}}. "
+                f"Consider using the full form in academic writing.",
+            )
+        )
+
+    # Informal words
+    for w, key in informal:
+        suggestion = INFORMAL_MAP[key]
+        found.append(
+            (
+                "informal",
+                f"Informal or vague word '{w}' in sentence {{idx}}. {suggestion}",
+            )
+        )
+
+    # First person (flag only)
+    for w in first_person:
+        found.append(
+            (
+                "first_person",
+                f"First-person pronoun '{w}' in sentence {{idx}}. "
+                f"Check if this is appropriate for your assignment guidelines.",
             )
+        )
+
+    # Sentence start (first 2 words)
+    start = f"{first} {second}" if second else first
+
+    return tuple(found), start
+
+
+def analyse_text(text: str):
+    """
+    Analyse text and return:
+      - sentences
+      - list of issues (each issue is an Issue)
+    """
+    if len(text) >= JIT_MIN_CHARS:
+        _enable_jit()
+    return analyse_sentences(split_sentences(text))
+
+
+def analyse_sentences(sentence_iter):
+    """
+    Like analyse_text, but takes an iterable of sentences, which are checked
+    as they arrive (e.g. from stream_sentences).
+    """
+    sentences = []
+    issues = []
+
+    # Track repeated sentence starts (first 2 words)
+    starts = []
+    start_counts = {}
 
-        # First person (flag only)
-        for m in FIRST_PERSON_PATTERN.finditer(s):
+    for idx, s in enumerate(sentence_iter, start=1):
+        sentences.append(s)
+        found, start = _analyse_sentence(s)
+        for issue_type, message in found:
             issues.append(
-                {
-                    "type": "first_person",
-                    "sentence_index": idx,
-                    "message": f"First-person pronoun '{m.group(0)}' in sentence {idx}. "
-                               f"Check if this is appropriate for your assignment guidelines.",
-                    "extract": s,
-                }
+                Issue(
+                    type=issue_type,
+                    sentence_index=idx,
+                    message=message.format(idx=idx),
+                )
             )
-
-        # Collect sentence start (first 2 words)
-        if len(words) >= 2:
-            start = " ".join(words[0:2]).lower()
-        elif words:
-            start = words[0].lower()
-        else:
-            start = ""
         starts.append(start)
+        start_counts[start] = start_counts.get(start, 0) + 1
 
     # Repeated starts
-    counter = collections.Counter(starts)
     for idx, start in enumerate(starts, start=1):
-        if start and counter[start] > 2:  # appears 3+ times
+        if start and start_counts[start] > 2:  # appears 3+ times
             issues.append(
-                {
-                    "type": "repeated_start",
-                    "sentence_index": idx,
-                    "message": f"Several sentences start with '{start}'. "
-                               f"Varying openings can improve academic style and flow.",
-                    "extract": sentences[idx - 1],
-                }
+                Issue(
+                    type="repeated_start",
+                    sentence_index=idx,
+                    message=f"Several sentences start with '{start}'. "
+                            f"Varying openings can improve academic style and flow.",
+                )
             )
 
     return sentences, issues
 
 
+@functools.lru_cache(maxsize=4096)
+def _clean_segment(segment: str) -> str:
+    """Expand contractions and annotate informal terms in one segment."""
+    def repl_contraction(match):
+        return CONTRACTION_EXPANSIONS[match.lastindex - 1]
+
+    cleaned = CONTRACTION_PATTERN.sub(repl_contraction, segment)
+
+    # Add suggestions in brackets after informal terms, matching on a
+    # lower-cased copy and copying the original text across by span
+    out = []
+    pos = 0
+    for m in INFORMAL_PATTERN.finditer(_lower(cleaned)):
+        out.append(cleaned[pos:m.end()])
+        out.append(f" ({INFORMAL_SUGGESTIONS[m.lastindex - 1]})")
+        pos = m.end()
+    out.append(cleaned[pos:])
+    return "".join(out)
+
+
 def clean_text(text: str, wrap: int = 90) -> str:
     """
     Produce a gently 'cleaned' version:
     - Expand contractions
     - Softly replace some informal terms
     """
-    def repl_contraction(match):
-        word = match.group(0)
-        return CONTRACTION_MAP.get(word, CONTRACTION_MAP.get(word.lower(), word))
-
-    cleaned = CONTRACTION_PATTERN.sub(repl_contraction, text)
+    # No pattern spans a sentence break, so segments can be cleaned (and
+    # cached) independently; the whitespace between them is collapsed anyway.
+    cleaned = " ".join(_clean_segment(seg) for seg in CLEAN_SPLIT_PATTERN.split(text))
 
-    # Replace informal terms with suggestions in brackets
-    def repl_informal(match):
-        word = match.group(0)
-        key = word.lower()
-        suggestion = INFORMAL_MAP.get(key)
-        if suggestion:
-            return f"{word} ({suggestion})"
-        return word
-
-    cleaned = INFORMAL_PATTERN.sub(repl_informal, cleaned)
-
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
-    return fill(cleaned, width=wrap)
+    cleaned = SPACE_PATTERN.sub(" ", cleaned).strip()
+    return greedy_fill(cleaned, width=wrap)
 
 
 def print_report(sentences, issues):
-    print("=== Style Analysis (UK Academic) ===\n")
-    print(f"Total sentences: {len(sentences)}")
-    print(f"Total issues found: {len(issues)}\n")
+    # Build the whole report first and write it once, rather than issuing
+    # several print() calls per issue.
+    out = [
+        "=== Style Analysis (UK Academic) ===\n",
+        f"Total sentences: {len(sentences)}",
+        f"Total issues found: {len(issues)}\n",
+    ]
 
     if not issues:
-        print("No major style issues detected based on the current checks.")
-        return
+        out.append("No major style issues detected based on the current checks.")
+    else:
+        for i, issue in enumerate(issues, start=1):
+            out.append(f"Issue {i}: [{issue.type}]")
+            out.append(issue.message)
+            out.append(f"Sentence: {sentences[issue.sentence_index - 1]}")
+            out.append("-" * 60)
 
-    for i, issue in enumerate(issues, start=1):
-        print(f"Issue {i}: [{issue['type']}]")
-        print(issue["message"])
-        print("Sentence:", issue["extract"])
-        print("-" * 60)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
@@ -281,13 +534,25 @@ def main():
     if sys.stdin.isatty():
         print("Paste your text below. End input with Ctrl+D (Linux/macOS) or Ctrl+Z then Enter (Windows):\n")
 
-    text = sys.stdin.read()
-
-    if not text.strip():
+    if args.clean:
+        # Cleaning works on the raw text, so read it all
+        text = sys.stdin.read()
+        sentences, issues = analyse_text(text)
+    else:
+        # Analyse sentences as they are read. Piped input has no known size,
+        # so only a large redirected file turns on the JIT kernel.
+        try:
+            size = os.fstat(sys.stdin.fileno()).st_size
+        except (OSError, ValueError):
+            size = 0
+        if size >= JIT_MIN_CHARS:
+            _enable_jit()
+        sentences, issues = analyse_sentences(stream_sentences(sys.stdin))
+
+    if not sentences:
         print("No input text received.")
         return
 
-    sentences, issues = analyse_text(text)
     print_report(sentences, issues)
 
     if args.clean:
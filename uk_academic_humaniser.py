@@ -14,8 +14,10 @@ Usage:
 """
 
 import re
-from textwrap import fill
 import random
+from typing import Optional
+
+from _sentence_utils import SPACE_PATTERN, greedy_fill, split_sentences, stream_sentences
 
 # Formal connectors suitable for UK academic writing
 ACADEMIC_CONNECTORS = [
@@ -38,37 +40,46 @@ LIGHT_REPHRASINGS = [
     (r"\bto summarise\b", "to summarise"),
 ]
 
-
-def split_sentences(text: str):
-    """Crude sentence splitter."""
-    text = re.sub(r"([.!?])([A-Za-z])", r"\1 \2", text)
-    parts = re.split(r"([.!?])", text)
-    sentences = []
-    for i in range(0, len(parts) - 1, 2):
-        s = (parts[i] + parts[i + 1]).strip()
-        if s:
-            sentences.append(s)
-    if len(parts) % 2 != 0 and parts[-1].strip():
-        sentences.append(parts[-1].strip())
-    return sentences
+# All rephrasings as one pattern with a group per entry, so a single scan
+# applies them all; m.lastindex - 1 indexes LIGHT_REPHRASINGS.
+LIGHT_REPHRASINGS_PATTERN = re.compile(
+    "|".join(f"({pattern})" for pattern, _ in LIGHT_REPHRASINGS),
+    flags=re.IGNORECASE,
+)
+LIGHT_REPHRASINGS_REPLACEMENTS = [replacement for _, replacement in LIGHT_REPHRASINGS]
 
 
 def apply_light_rephrasings(text: str) -> str:
-    for pattern, replacement in LIGHT_REPHRASINGS:
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-    return text
-
-
-def academic_tone(sentence: str, idx: int, total: int) -> str:
+    def repl(match):
+        return LIGHT_REPHRASINGS_REPLACEMENTS[match.lastindex - 1]
+
+    return LIGHT_REPHRASINGS_PATTERN.sub(repl, text)
+
+
+def academic_tone(
+    sentence: str,
+    idx: int,
+    total: int,
+    roll: Optional[float] = None,
+    connector: Optional[str] = None,
+) -> str:
+    """
+    roll and connector may be pre-drawn by the caller (see
+    humanise_uk_academic); otherwise they are drawn here.
+    """
     original = sentence
 
     # Very mild rephrasing
     s = apply_light_rephrasings(sentence)
 
     # Add connectors between sentences (sparingly)
-    if 0 < idx < total and random.random() < 0.35:
-        connector = random.choice(ACADEMIC_CONNECTORS)
-        s = connector + s[0].lower() + s[1:]
+    if 0 < idx < total:
+        if roll is None:
+            roll = random.random()
+        if roll < 0.35:
+            if connector is None:
+                connector = random.choice(ACADEMIC_CONNECTORS)
+            s = connector + s[0].lower() + s[1:]
 
     # Do not introduce contractions in UK academic writing
     return s or original
@@ -76,19 +87,28 @@ def academic_tone(sentence: str, idx: int, total: int) -> str:
 
 def humanise_uk_academic(text: str, wrap: int = 90):
     """Humanises text to a natural UK-academic tone."""
-    text = re.sub(r"\s+", " ", text).strip()
+    text = SPACE_PATTERN.sub(" ", text).strip()
     if not text:
         return ""
 
-    sentences = split_sentences(text)
+    return humanise_sentences(split_sentences(text), wrap=wrap)
+
+
+def humanise_sentences(sentences, wrap: int = 90):
+    """Humanises already-split sentences (whitespace collapsed)."""
+    total = len(sentences)
     new = []
 
+    # Draw all the random choices up front rather than per sentence
+    rolls = [random.random() for _ in range(total)]
+    connectors = random.choices(ACADEMIC_CONNECTORS, k=total)
+
     for idx, s in enumerate(sentences):
-        new.append(academic_tone(s, idx, len(sentences)))
+        new.append(academic_tone(s, idx, total, rolls[idx], connectors[idx]))
 
     result = " ".join(new)
 
-    return fill(result, width=wrap)
+    return greedy_fill(result, width=wrap)
 
 
 # CLI
@@ -96,8 +116,9 @@ def main():
     import sys
 
     print("Paste text to humanise (Ctrl+D to finish):\n")
-    text = sys.stdin.read()
-    out = humanise_uk_academic(text)
+    # Split while reading, so the raw text is never held alongside the sentences
+    sentences = [SPACE_PATTERN.sub(" ", s) for s in stream_sentences(sys.stdin)]
+    out = humanise_sentences(sentences)
     print("\n--- Humanised (UK Academic Tone) ---\n")
     print(out)
 